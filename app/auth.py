@@ -1,15 +1,53 @@
 import hashlib
+import threading
+import time
+
 from fastapi import Header, HTTPException, Depends
 from sqlalchemy.orm import Session
 
 from app.database import get_db, crud
 
+# Recently seen key hashes -> (user ID, expiry), so repeat requests skip the apiKeys query
+API_KEY_CACHE_TTL = 60
+API_KEY_CACHE_SIZE = 10_000
+_api_key_cache: dict[str, tuple[str, float]] = {}
+_api_key_cache_lock = threading.Lock()
+
 
 def hash_api_key(api_key: str) -> str:
     """Hash an API key using SHA256."""
     return hashlib.sha256(api_key.encode()).hexdigest()
 
 
+def _get_cached_user_id(key_hash: str) -> str | None:
+    with _api_key_cache_lock:
+        entry = _api_key_cache.get(key_hash)
+        if entry is None:
+            return None
+        user_id, expires_at = entry
+        if expires_at < time.monotonic():
+            del _api_key_cache[key_hash]
+            return None
+        return user_id
+
+
+def _cache_user_id(key_hash: str, user_id: str) -> None:
+    with _api_key_cache_lock:
+        if key_hash not in _api_key_cache and len(_api_key_cache) >= API_KEY_CACHE_SIZE:
+            # Evict the oldest entry
+            del _api_key_cache[next(iter(_api_key_cache))]
+        _api_key_cache[key_hash] = (user_id, time.monotonic() + API_KEY_CACHE_TTL)
+
+
+def invalidate_api_key(key_hash: str | None = None) -> None:
+    """Drop a cached API key, or every cached key if none is given. Call when keys are revoked."""
+    with _api_key_cache_lock:
+        if key_hash is None:
+            _api_key_cache.clear()
+        else:
+            _api_key_cache.pop(key_hash, None)
+
+
 def get_current_user(
     x_api_key: str = Header(...),
     db: Session = Depends(get_db)
@@ -18,24 +56,30 @@ def get_current_user(
     Dependency that validates the API key and returns the current user.
 
     - Hashes the incoming X-API-Key
-    - Looks it up in the apiKeys table
+    - Looks it up in the apiKeys table (cached for API_KEY_CACHE_TTL seconds)
     - Returns the associated user
     - Raises 401 if invalid
     """
     key_hash = hash_api_key(x_api_key)
 
-    # Find the API key in the database
-    api_key_record = db.query(crud.models.ApiKey).filter(
-        crud.models.ApiKey.keyHash == key_hash
-    ).first()
+    user_id = _get_cached_user_id(key_hash)
+    if user_id is None:
+        # Find the API key in the database
+        api_key_record = db.query(crud.models.ApiKey).filter(
+            crud.models.ApiKey.keyHash == key_hash
+        ).first()
+
+        if not api_key_record:
+            raise HTTPException(status_code=401, detail="Invalid API key")
 
-    if not api_key_record:
-        raise HTTPException(status_code=401, detail="Invalid API key")
+        user_id = api_key_record.userID
+        _cache_user_id(key_hash, user_id)
 
     # Get the user associated with this API key
-    user = crud.get_user(db, api_key_record.userID)
+    user = crud.get_user(db, user_id)
 
     if not user:
+        invalidate_api_key(key_hash)
         raise HTTPException(status_code=401, detail="User not found for this API key")
 
     return user
@@ -9,6 +9,7 @@ from .models import (
     ItemsAtPickupPoint,
     ItemsInCar,
     ItemsInStorage,
+    DropOffDistance,
 )
 from . import crud
 
@@ -25,5 +26,6 @@ __all__ = [
     "ItemsAtPickupPoint",
     "ItemsInCar",
     "ItemsInStorage",
+    "DropOffDistance",
     "crud",
 ]
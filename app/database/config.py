@@ -1,8 +1,16 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 DATABASE_URL = "sqlite:///./app/data.db"
 
+# Development mode - makes unexpected lazy loads raise instead of querying
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true")
+
+# Sync endpoints run on anyio's worker threads, which default to 40
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "60"))
+
 
 class Base(DeclarativeBase):
     pass
@@ -11,6 +19,10 @@ class Base(DeclarativeBase):
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
+    # One connection per endpoint thread, a third of them kept open between requests
+    pool_size=THREADPOOL_SIZE // 3,
+    max_overflow=THREADPOOL_SIZE - THREADPOOL_SIZE // 3,
+    pool_timeout=30,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,11 +1,30 @@
 from typing import List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, raiseload
 
 from . import models
+from .config import DEBUG
 from .. import schemas
 
 
+def _loader_options() -> list:
+    """Loader options for list queries. In DEBUG, any lazy load raises instead of issuing a query."""
+    return [raiseload("*")] if DEBUG else []
+
+
+def _upsert_quantity(db: Session, model, quantity: int, **keys: str) -> None:
+    """Insert an item quantity row, or overwrite the quantity if it already exists."""
+    stmt = (
+        insert(model)
+        .values(**keys, quantity=quantity)
+        .on_conflict_do_update(index_elements=list(keys), set_={"quantity": quantity})
+    )
+    db.execute(stmt)
+    db.commit()
+
+
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     db_user = models.User(**user.model_dump())
     db.add(db_user)
@@ -15,7 +34,11 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
 
 
 def get_user(db: Session, user_id: str) -> models.User | None:
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.get(models.User, user_id)
+
+
+def user_exists(db: Session, user_id: str) -> bool:
+    return db.execute(select(exists().where(models.User.id == user_id))).scalar()
 
 
 def update_user(
@@ -66,12 +89,18 @@ def create_item_variant(
     return db_item_variant
 
 
+def create_item_variants(
+    db: Session, item_variants: List[schemas.ItemVariantCreate]
+) -> List[schemas.ItemVariantCreate]:
+    """Create several item variants with one INSERT and one commit."""
+    if item_variants:
+        db.execute(insert(models.ItemVariant), [item.model_dump() for item in item_variants])
+        db.commit()
+    return item_variants
+
+
 def get_item_variant(db: Session, item_variant_id: str) -> models.ItemVariant | None:
-    return (
-        db.query(models.ItemVariant)
-        .filter(models.ItemVariant.id == item_variant_id)
-        .first()
-    )
+    return db.get(models.ItemVariant, item_variant_id)
 
 
 def update_item_variant(
@@ -101,11 +130,13 @@ def create_pickup_point(
 
 
 def get_pickup_point(db: Session, pickup_point_id: str) -> models.PickupPoint | None:
-    return (
-        db.query(models.PickupPoint)
-        .filter(models.PickupPoint.id == pickup_point_id)
-        .first()
-    )
+    return db.get(models.PickupPoint, pickup_point_id)
+
+
+def pickup_point_exists(db: Session, pickup_point_id: str) -> bool:
+    return db.execute(
+        select(exists().where(models.PickupPoint.id == pickup_point_id))
+    ).scalar()
 
 
 def update_pickup_point(
@@ -128,7 +159,7 @@ def get_active_pickup_requests(
     db: Session
 ) -> List[schemas.PickupRequest]:
     return (
-        db.query(models.PickupRequest).all()
+        db.query(models.PickupRequest).options(*_loader_options()).all()
     )
 
 
@@ -169,6 +200,7 @@ def get_pickup_request_responses(
 ) -> List[models.PickupRequestResponses]:
     return (
         db.query(models.PickupRequestResponses)
+        .options(*_loader_options())
         .filter(models.PickupRequestResponses.requestID == id)
         .all()
     )
@@ -220,11 +252,13 @@ def create_storage_point(
 def get_storage_point(
     db: Session, storage_point_id: str
 ) -> models.StoragePoint | None:
-    return (
-        db.query(models.StoragePoint)
-        .filter(models.StoragePoint.id == storage_point_id)
-        .first()
-    )
+    return db.get(models.StoragePoint, storage_point_id)
+
+
+def storage_point_exists(db: Session, storage_point_id: str) -> bool:
+    return db.execute(
+        select(exists().where(models.StoragePoint.id == storage_point_id))
+    ).scalar()
 
 
 def update_storage_point(
@@ -257,11 +291,7 @@ def create_drop_off_point(
 def get_drop_off_point(
     db: Session, drop_off_point_id: str
 ) -> models.DropOffPoint | None:
-    return (
-        db.query(models.DropOffPoint)
-        .filter(models.DropOffPoint.id == drop_off_point_id)
-        .first()
-    )
+    return db.get(models.DropOffPoint, drop_off_point_id)
 
 
 def update_drop_off_point(
@@ -272,6 +302,10 @@ def update_drop_off_point(
     if not db_point:
         return None
 
+    # Cached travel times are stale once the point moves
+    if db_point.location != point_update.location:
+        delete_drop_off_distances(db, drop_off_point_id)
+
     db_point.name = point_update.name
     db_point.location = point_update.location
 
@@ -280,6 +314,45 @@ def update_drop_off_point(
     return db_point
 
 
+def get_drop_off_distances(
+    db: Session, drop_off_point_ids: List[str]
+) -> list[models.DropOffDistance]:
+    """Get the cached travel times between the given drop-off points."""
+    return (
+        db.query(models.DropOffDistance)
+        .filter(
+            models.DropOffDistance.fromID.in_(drop_off_point_ids),
+            models.DropOffDistance.toID.in_(drop_off_point_ids),
+        )
+        .all()
+    )
+
+
+def replace_drop_off_distances(
+    db: Session, drop_off_point_ids: List[str], matrix: List[List[float]]
+) -> None:
+    """Store a full travel time matrix between the given drop-off points."""
+    db.query(models.DropOffDistance).filter(
+        models.DropOffDistance.fromID.in_(drop_off_point_ids),
+        models.DropOffDistance.toID.in_(drop_off_point_ids),
+    ).delete(synchronize_session=False)
+
+    db.add_all([
+        models.DropOffDistance(fromID=from_id, toID=to_id, minutes=matrix[i][j])
+        for i, from_id in enumerate(drop_off_point_ids)
+        for j, to_id in enumerate(drop_off_point_ids)
+    ])
+    db.commit()
+
+
+def delete_drop_off_distances(db: Session, drop_off_point_id: str) -> None:
+    """Drop cached travel times to and from a drop-off point (not committed)."""
+    db.query(models.DropOffDistance).filter(
+        (models.DropOffDistance.fromID == drop_off_point_id)
+        | (models.DropOffDistance.toID == drop_off_point_id)
+    ).delete(synchronize_session=False)
+
+
 def create_items_at_pickup_point(
     db: Session, record: schemas.ItemsAtPickupPointCreate
 ) -> models.ItemsAtPickupPoint:
@@ -313,6 +386,25 @@ def get_all_items_at_pickup_point(
     )
 
 
+def get_pickup_point_with_items(
+    db: Session, pickup_point_id: str
+) -> list[tuple[str | None, int | None]]:
+    """
+    Get a pickup point's (itemVariantID, quantity) pairs in a single query.
+    Empty if the pickup point doesn't exist; a single (None, None) row if it holds no items.
+    """
+    return (
+        db.query(models.ItemsAtPickupPoint.itemVariantID, models.ItemsAtPickupPoint.quantity)
+        .select_from(models.PickupPoint)
+        .outerjoin(
+            models.ItemsAtPickupPoint,
+            models.ItemsAtPickupPoint.pickupPointID == models.PickupPoint.id,
+        )
+        .filter(models.PickupPoint.id == pickup_point_id)
+        .all()
+    )
+
+
 def update_items_at_pickup_point(
     db: Session,
     pickup_point_id: str,
@@ -331,6 +423,22 @@ def update_items_at_pickup_point(
     return db_record
 
 
+def upsert_items_at_pickup_point(
+    db: Session,
+    pickup_point_id: str,
+    item_variant_id: str,
+    quantity: int,
+) -> None:
+    """Set the quantity of items at a pickup point, creating the record if needed."""
+    _upsert_quantity(
+        db,
+        models.ItemsAtPickupPoint,
+        quantity,
+        pickupPointID=pickup_point_id,
+        itemVariantID=item_variant_id,
+    )
+
+
 def create_items_in_car(
     db: Session, record: schemas.ItemsInCarCreate
 ) -> models.ItemsInCar:
@@ -364,6 +472,22 @@ def get_all_items_in_car(
     )
 
 
+def get_user_with_items(
+    db: Session, user_id: str
+) -> list[tuple[str | None, int | None]]:
+    """
+    Get the (itemVariantID, quantity) pairs in a user's car in a single query.
+    Empty if the user doesn't exist; a single (None, None) row if the car is empty.
+    """
+    return (
+        db.query(models.ItemsInCar.itemVariantID, models.ItemsInCar.quantity)
+        .select_from(models.User)
+        .outerjoin(models.ItemsInCar, models.ItemsInCar.userID == models.User.id)
+        .filter(models.User.id == user_id)
+        .all()
+    )
+
+
 def update_items_in_car(
     db: Session,
     user_id: str,
@@ -382,6 +506,22 @@ def update_items_in_car(
     return db_record
 
 
+def upsert_items_in_car(
+    db: Session,
+    user_id: str,
+    item_variant_id: str,
+    quantity: int,
+) -> None:
+    """Set the quantity of items in a user's car, creating the record if needed."""
+    _upsert_quantity(
+        db,
+        models.ItemsInCar,
+        quantity,
+        userID=user_id,
+        itemVariantID=item_variant_id,
+    )
+
+
 def create_items_in_storage(
     db: Session, record: schemas.ItemsInStorageCreate
 ) -> models.ItemsInStorage:
@@ -405,6 +545,25 @@ def get_items_in_storage(
     )
 
 
+def get_storage_point_with_items(
+    db: Session, storage_id: str
+) -> list[tuple[str | None, int | None]]:
+    """
+    Get a storage point's (itemVariantID, quantity) pairs in a single query.
+    Empty if the storage point doesn't exist; a single (None, None) row if it holds no items.
+    """
+    return (
+        db.query(models.ItemsInStorage.itemVariantID, models.ItemsInStorage.quantity)
+        .select_from(models.StoragePoint)
+        .outerjoin(
+            models.ItemsInStorage,
+            models.ItemsInStorage.storageID == models.StoragePoint.id,
+        )
+        .filter(models.StoragePoint.id == storage_id)
+        .all()
+    )
+
+
 def update_items_in_storage(
     db: Session,
     storage_id: str,
@@ -421,3 +580,19 @@ def update_items_in_storage(
     db.commit()
     db.refresh(db_record)
     return db_record
+
+
+def upsert_items_in_storage(
+    db: Session,
+    storage_id: str,
+    item_variant_id: str,
+    quantity: int,
+) -> None:
+    """Set the quantity of items in storage, creating the record if needed."""
+    _upsert_quantity(
+        db,
+        models.ItemsInStorage,
+        quantity,
+        storageID=storage_id,
+        itemVariantID=item_variant_id,
+    )
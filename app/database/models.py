@@ -1,5 +1,5 @@
-from sqlalchemy import String, Integer, Float, ForeignKey, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 
 from .config import Base
@@ -17,6 +17,8 @@ class User(Base):
 
 class ApiKey(Base):
     __tablename__ = "apiKeys"
+    # Authentication looks keys up by hash alone, which the primary key can't serve
+    __table_args__ = (Index("ix_apiKeys_keyHash", "keyHash"),)
 
     userID: Mapped[str] = mapped_column(
         ForeignKey("users.id"), primary_key=True)
@@ -46,6 +48,8 @@ class PickupRequest(Base):
     pickupPointID: Mapped[str] = mapped_column(
         ForeignKey("pickupPoints.id"), nullable=False)
 
+    pickupPoint: Mapped["PickupPoint"] = relationship()
+
 
 class PickupRequestResponses(Base):
     __tablename__ = "pickupRequestResponses"
@@ -112,6 +116,10 @@ class ItemsInStorage(Base):
 class Auction(Base):
     """Tracks an active auction for a pickup request."""
     __tablename__ = "auctions"
+    __table_args__ = (
+        Index("ix_auctions_pickupRequestID_status", "pickupRequestID", "status"),
+        Index("ix_auctions_status", "status"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     pickupRequestID: Mapped[str] = mapped_column(
@@ -137,3 +145,16 @@ class AuctionBid(Base):
     estimatedTime: Mapped[float] = mapped_column(Float, nullable=True)  # Minutes to pickup
     score: Mapped[float] = mapped_column(Float, nullable=True)  # Final calculated score
     createdAt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    user: Mapped["User"] = relationship()
+
+
+class DropOffDistance(Base):
+    """Cached travel time between two drop-off points."""
+    __tablename__ = "dropOffDistances"
+
+    fromID: Mapped[str] = mapped_column(
+        ForeignKey("dropOffPoints.id"), primary_key=True)
+    toID: Mapped[str] = mapped_column(
+        ForeignKey("dropOffPoints.id"), primary_key=True)
+    minutes: Mapped[float] = mapped_column(Float, nullable=False)
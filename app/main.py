@@ -1,7 +1,11 @@
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file
 
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from endpoints.user import router as user_router
 from endpoints.item import router as item_router
@@ -13,8 +17,20 @@ from endpoints.default import router as default_router
 from endpoints.auction import router as auction_router
 
 from .database import engine, Base
+from .database.config import THREADPOOL_SIZE
+from .services.maps_service import get_ors_client, close_ors_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Open the shared ORS client on the server's event loop
+    get_ors_client()
+    yield
+    await close_ors_client()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 permitted_origins = ["https://ichack.unigeorge.uk", "http://localhost"]
 
@@ -104,6 +104,15 @@ class StorageItemResponse(BaseModel):
     quantity: int
 
 
+class ItemQuantityUpdate(BaseModel):
+    quantity: int = 0
+
+
+class LocationUpdate(BaseModel):
+    latitude: float
+    longitude: float
+
+
 # ============== Auction Schemas ==============
 
 class AuctionCreate(BaseModel):
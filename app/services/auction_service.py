@@ -11,19 +11,30 @@ Flow:
 5. Select winner and prepare routing data
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 
-from app.database import models
+from app.database import models, crud
 from app import schemas
-from app.services.maps_service import calculate_distance_matrix
+from app.services.maps_service import (
+    calculate_distance_matrix,
+    estimate_distance_matrix,
+    parse_location_string,
+)
 
 
 # Auction configuration
 AUCTION_DURATION_SECONDS = 60
 
+# Routing input for one volunteer and at most this many drop-offs uses straight-line estimates
+LOCAL_ESTIMATE_MAX_DROPOFFS = 2
+
 # Scoring weights
 WEIGHT_TIME = 0.6       # Lower travel time = better
 WEIGHT_CAPACITY = 0.25  # More capacity = better
@@ -49,7 +60,7 @@ def create_auction(db: Session, pickup_request_id: str) -> models.Auction:
 
 def get_auction(db: Session, auction_id: str) -> Optional[models.Auction]:
     """Get an auction by ID."""
-    return db.query(models.Auction).filter(models.Auction.id == auction_id).first()
+    return db.get(models.Auction, auction_id)
 
 
 def get_auction_by_pickup_request(db: Session, pickup_request_id: str) -> Optional[models.Auction]:
@@ -72,46 +83,39 @@ def submit_bid(
     accepted: bool,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None
-) -> Optional[models.AuctionBid]:
-    """Submit a volunteer's bid to an auction."""
+) -> Optional[Row]:
+    """Submit a volunteer's bid to an auction. Returns the stored bid as a plain row."""
     auction = get_auction(db, auction_id)
     if not auction or auction.status != "active":
         return None
     
     # Check if auction has expired
-    if datetime.utcnow() > auction.expiresAt:
+    now = datetime.utcnow()
+    if now > auction.expiresAt:
         return None
     
-    # Check if user already bid
-    existing_bid = db.query(models.AuctionBid).filter(
-        models.AuctionBid.auctionID == auction_id,
-        models.AuctionBid.userID == user_id
-    ).first()
-    
-    if existing_bid:
-        # Update existing bid
-        existing_bid.accepted = 1 if accepted else 0
-        existing_bid.latitude = latitude
-        existing_bid.longitude = longitude
-        existing_bid.createdAt = datetime.utcnow()
-        db.commit()
-        db.refresh(existing_bid)
-        return existing_bid
-    
-    # Create new bid
-    bid = models.AuctionBid(
+    # Insert the bid, or overwrite the user's earlier bid, and read the row back in one statement
+    accepted_flag = 1 if accepted else 0
+    stmt = insert(models.AuctionBid).values(
         auctionID=auction_id,
         userID=user_id,
-        accepted=1 if accepted else 0,
+        accepted=accepted_flag,
         latitude=latitude,
         longitude=longitude,
         estimatedTime=None,
         score=None,
-        createdAt=datetime.utcnow()
-    )
-    db.add(bid)
+        createdAt=now
+    ).on_conflict_do_update(
+        index_elements=["auctionID", "userID"],
+        set_={
+            "accepted": accepted_flag,
+            "latitude": latitude,
+            "longitude": longitude,
+            "createdAt": now,
+        }
+    ).returning(*models.AuctionBid.__table__.c)
+    bid = db.execute(stmt).one()
     db.commit()
-    db.refresh(bid)
     return bid
 
 
@@ -123,13 +127,66 @@ def get_auction_bids(db: Session, auction_id: str) -> List[models.AuctionBid]:
 
 
 def get_accepted_bids(db: Session, auction_id: str) -> List[models.AuctionBid]:
-    """Get all accepted (Y) bids for an auction."""
-    return db.query(models.AuctionBid).filter(
+    """Get all accepted (Y) bids for an auction, with their volunteers loaded."""
+    return db.query(models.AuctionBid).options(
+        selectinload(models.AuctionBid.user)
+    ).filter(
         models.AuctionBid.auctionID == auction_id,
         models.AuctionBid.accepted == 1
     ).all()
 
 
+def _get_pickup_items(
+    db: Session,
+    pickup_request: Optional[models.PickupRequest]
+) -> Tuple[List[int], str, int]:
+    """
+    Get the items waiting at a pickup request's pickup point.
+
+    Returns (volume of each individual item, first item variant ID, number of item types).
+    """
+    if not pickup_request:
+        return [], "", 0
+
+    # (variant ID, quantity, volume) rows in one query; volume is None for unknown variants
+    items_at_pickup = db.query(
+        models.ItemsAtPickupPoint.itemVariantID,
+        models.ItemsAtPickupPoint.quantity,
+        models.ItemVariant.volume,
+    ).outerjoin(
+        models.ItemVariant,
+        models.ItemVariant.id == models.ItemsAtPickupPoint.itemVariantID
+    ).filter(
+        models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
+    ).all()
+
+    # Add volume for each unit of the item
+    item_volumes = []
+    for _, quantity, volume in items_at_pickup:
+        if volume is not None:
+            item_volumes.extend([volume] * quantity)
+
+    # Use first item variant as the main item
+    item_id = items_at_pickup[0].itemVariantID if items_at_pickup else ""
+    num_item_types = len({row.itemVariantID for row in items_at_pickup})
+
+    return item_volumes, item_id, num_item_types
+
+
+def _empty_routing_input(volunteers: List[models.User]) -> schemas.RoutingInput:
+    """Routing input for when there are no drop-offs to route to - skips all distance work."""
+    return schemas.RoutingInput(
+        distance_matrix=[[] for _ in volunteers],
+        drops_matrix=[],
+        item_volumes=[],
+        car_caps=[v.maxVolume for v in volunteers],
+        volunteer_ids=[v.id for v in volunteers],
+        dropoff_ids=[],
+        car_contents=[[] for _ in volunteers],
+        item_id=""
+    )
+
+
 def calculate_volunteer_score(
     travel_time: float,
     max_travel_time: float,
@@ -181,7 +238,7 @@ async def process_auction(db: Session, auction_id: str) -> Optional[schemas.Auct
     if not accepted_bids:
         # No volunteers accepted, close auction
         auction.status = "closed"
-        db.commit()
+        await run_in_threadpool(db.commit)
         return schemas.AuctionResult(
             auctionID=auction_id,
             winnerUserID=None,
@@ -189,22 +246,21 @@ async def process_auction(db: Session, auction_id: str) -> Optional[schemas.Auct
         )
     
     # Get pickup point location
-    pickup_request = db.query(models.PickupRequest).filter(
+    pickup_request = db.query(models.PickupRequest).options(
+        joinedload(models.PickupRequest.pickupPoint)
+    ).filter(
         models.PickupRequest.id == auction.pickupRequestID
     ).first()
     
     if not pickup_request:
         return None
     
-    pickup_point = db.query(models.PickupPoint).filter(
-        models.PickupPoint.id == pickup_request.pickupPointID
-    ).first()
+    pickup_point = pickup_request.pickupPoint
     
     if not pickup_point:
         return None
     
     # Parse pickup point location (stored as "lat,lng" string)
-    from app.services.maps_service import parse_location_string
     pickup_location = parse_location_string(pickup_point.location)
     if not pickup_location:
         print(f"Error parsing pickup location: {pickup_point.location}")
@@ -213,17 +269,16 @@ async def process_auction(db: Session, auction_id: str) -> Optional[schemas.Auct
     # Get volunteer locations and user data
     volunteer_data = []
     for bid in accepted_bids:
-        user = db.query(models.User).filter(models.User.id == bid.userID).first()
-        if user and bid.latitude and bid.longitude:
+        if bid.user and bid.latitude and bid.longitude:
             volunteer_data.append({
                 "bid": bid,
-                "user": user,
+                "user": bid.user,
                 "location": (bid.latitude, bid.longitude)
             })
     
     if not volunteer_data:
         auction.status = "closed"
-        db.commit()
+        await run_in_threadpool(db.commit)
         return schemas.AuctionResult(
             auctionID=auction_id,
             winnerUserID=None,
@@ -238,8 +293,8 @@ async def process_auction(db: Session, auction_id: str) -> Optional[schemas.Auct
         distance_matrix = await calculate_distance_matrix(origins, destinations)
     except Exception as e:
         print(f"Error calculating distances: {e}")
-        # Fallback: use placeholder times
-        distance_matrix = [[10.0] for _ in origins]  # 10 minutes default
+        # Fallback: estimate from straight-line distance
+        distance_matrix = estimate_distance_matrix(origins, destinations)
     
     # Extract travel times and calculate scores
     max_time = max(row[0] for row in distance_matrix) if distance_matrix else 1
@@ -276,7 +331,7 @@ async def process_auction(db: Session, auction_id: str) -> Optional[schemas.Auct
     else:
         auction.status = "closed"
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     
     # Prepare result
     bids_read = [
@@ -320,10 +375,7 @@ def prepare_routing_input(
         return None
     
     # Get ALL accepted bids (available volunteers)
-    accepted_bids = db.query(models.AuctionBid).filter(
-        models.AuctionBid.auctionID == auction_id,
-        models.AuctionBid.accepted == True
-    ).all()
+    accepted_bids = get_accepted_bids(db, auction_id)
     
     if not accepted_bids:
         return None
@@ -331,12 +383,8 @@ def prepare_routing_input(
     # Get volunteer info for all accepted bids
     volunteers = []
     for bid in accepted_bids:
-        if bid.latitude and bid.longitude:
-            user = db.query(models.User).filter(
-                models.User.id == bid.userID
-            ).first()
-            if user:
-                volunteers.append(user)
+        if bid.latitude and bid.longitude and bid.user:
+            volunteers.append(bid.user)
     
     if not volunteers:
         return None
@@ -345,17 +393,9 @@ def prepare_routing_input(
     dropoff_points = db.query(models.DropOffPoint).all()
     
     if not dropoff_points:
-        return schemas.RoutingInput(
-            distance_matrix=[],
-            drops_matrix=[],
-            item_volumes=[],
-            car_caps=[v.maxVolume for v in volunteers],
-            volunteer_ids=[v.id for v in volunteers],
-            dropoff_ids=[]
-        )
+        return _empty_routing_input(volunteers)
     
     # Parse drop-off locations
-    from app.services.maps_service import parse_location_string
     valid_dropoffs = []
     for dp in dropoff_points:
         loc = parse_location_string(dp.location)
@@ -363,24 +403,9 @@ def prepare_routing_input(
             valid_dropoffs.append(dp)
     
     # Get item volumes from pickup point
-    pickup_request = db.query(models.PickupRequest).filter(
-        models.PickupRequest.id == auction.pickupRequestID
-    ).first()
+    pickup_request = db.get(models.PickupRequest, auction.pickupRequestID)
     
-    item_volumes = []
-    if pickup_request:
-        items_at_pickup = db.query(models.ItemsAtPickupPoint).filter(
-            models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-        ).all()
-        
-        for item_record in items_at_pickup:
-            item = db.query(models.ItemVariant).filter(
-                models.ItemVariant.id == item_record.itemVariantID
-            ).first()
-            if item:
-                # Add volume for each unit of the item
-                for _ in range(item_record.quantity):
-                    item_volumes.append(item.volume)
+    item_volumes, item_id, num_item_types = _get_pickup_items(db, pickup_request)
     
     # Build distance matrices (placeholder values - use prepare_routing_input_with_distances for real values)
     num_dropoffs = len(valid_dropoffs)
@@ -394,20 +419,8 @@ def prepare_routing_input(
     
     dropoff_ids = [dp.id for dp in valid_dropoffs]
     
-    # Get item_id from the pickup request items (use first item variant as the main item)
-    item_id = ""
-    if pickup_request:
-        first_item = db.query(models.ItemsAtPickupPoint).filter(
-            models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-        ).first()
-        if first_item:
-            item_id = first_item.itemVariantID
-    
     # Car contents - initially empty for each volunteer (placeholder)
     # Each car has a vector of 0s representing no items currently loaded
-    num_item_types = len(set([iap.itemVariantID for iap in db.query(models.ItemsAtPickupPoint).filter(
-        models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-    ).all()])) if pickup_request else 0
     car_contents = [[0.0 for _ in range(num_item_types)] for _ in volunteers]
     
     return schemas.RoutingInput(
@@ -422,12 +435,113 @@ def prepare_routing_input(
     )
 
 
+def get_cached_drops_matrix(
+    db: Session,
+    dropoff_ids: List[str]
+) -> Optional[List[List[float]]]:
+    """
+    Build the drop-off to drop-off matrix from cached travel times.
+    Returns None if any pair is missing from the cache.
+    """
+    cached = {
+        (d.fromID, d.toID): d.minutes
+        for d in crud.get_drop_off_distances(db, dropoff_ids)
+    }
+    if len(cached) != len(dropoff_ids) ** 2:
+        return None
+
+    return [[cached[(a, b)] for b in dropoff_ids] for a in dropoff_ids]
+
+
+async def refresh_dropoff_matrix(
+    db: Session,
+    dropoff_points: Optional[List[models.DropOffPoint]] = None,
+    symmetric: bool = True
+) -> List[List[float]]:
+    """
+    Recalculate travel times between drop-off points via OpenRouteService and cache them.
+    Defaults to all drop-off points. Points with unparseable locations are skipped.
+
+    With symmetric=True, travel times are treated as the same in both directions, so
+    points whose times are already cached are reused and only new or moved points are
+    sent to ORS (one row each instead of the full matrix).
+    """
+    if dropoff_points is None:
+        dropoff_points = db.query(models.DropOffPoint).all()
+
+    dropoff_ids = []
+    dropoff_locations = []
+    for dp in dropoff_points:
+        loc = parse_location_string(dp.location)
+        if loc:
+            dropoff_ids.append(dp.id)
+            dropoff_locations.append(loc)
+
+    if not dropoff_locations:
+        return []
+
+    cached = {}
+    if symmetric:
+        cached = {
+            (d.fromID, d.toID): d.minutes
+            for d in crud.get_drop_off_distances(db, dropoff_ids)
+        }
+
+    # Drop the points with the most missing pairs until the rest are fully cached between themselves
+    known = set(dropoff_ids) if cached else set()
+    if known:
+        missing_counts = dict.fromkeys(dropoff_ids, 0)
+        missing_partners = {a: [] for a in dropoff_ids}
+        for a in dropoff_ids:
+            for b in dropoff_ids:
+                if (a, b) not in cached:
+                    missing_counts[a] += 1
+                    missing_counts[b] += 1
+                    missing_partners[a].append(b)
+                    missing_partners[b].append(a)
+        while known:
+            worst = max(known, key=missing_counts.get)
+            if missing_counts[worst] == 0:
+                break
+            known.remove(worst)
+            for other in missing_partners[worst]:
+                missing_counts[other] -= 1
+
+    fresh = [i for i, dp_id in enumerate(dropoff_ids) if dp_id not in known]
+    if len(fresh) == len(dropoff_ids):
+        drops_matrix = await calculate_distance_matrix(
+            origins=dropoff_locations,
+            destinations=dropoff_locations
+        )
+    else:
+        # Only fetch rows for the new points and mirror them into their columns
+        fresh_rows = await calculate_distance_matrix(
+            origins=[dropoff_locations[i] for i in fresh],
+            destinations=dropoff_locations
+        )
+        fetched = dict(zip(fresh, fresh_rows))
+        drops_matrix = [
+            [
+                fetched[i][j] if i in fetched
+                else fetched[j][i] if j in fetched
+                else cached[(dropoff_ids[i], dropoff_ids[j])]
+                for j in range(len(dropoff_ids))
+            ]
+            for i in range(len(dropoff_ids))
+        ]
+
+    await run_in_threadpool(crud.replace_drop_off_distances, db, dropoff_ids, drops_matrix)
+    return drops_matrix
+
+
 async def prepare_routing_input_with_distances(
     db: Session,
-    auction_id: str
+    auction_id: str,
+    symmetric_matrix: bool = True
 ) -> Optional[schemas.RoutingInput]:
     """
     Prepare routing input with REAL distances calculated via OpenRouteService.
+    With symmetric_matrix, cached drop-off times are reused when only some points changed.
     
     Returns:
     - distance_matrix: Travel times from EACH available volunteer to all drop-off points (in minutes)
@@ -442,10 +556,7 @@ async def prepare_routing_input_with_distances(
         return None
     
     # Get ALL accepted bids (available volunteers)
-    accepted_bids = db.query(models.AuctionBid).filter(
-        models.AuctionBid.auctionID == auction_id,
-        models.AuctionBid.accepted == True
-    ).all()
+    accepted_bids = get_accepted_bids(db, auction_id)
     
     if not accepted_bids:
         return None
@@ -455,13 +566,9 @@ async def prepare_routing_input_with_distances(
     volunteer_locations = []
     
     for bid in accepted_bids:
-        if bid.latitude and bid.longitude:
-            user = db.query(models.User).filter(
-                models.User.id == bid.userID
-            ).first()
-            if user:
-                volunteers.append(user)
-                volunteer_locations.append((bid.latitude, bid.longitude))
+        if bid.latitude and bid.longitude and bid.user:
+            volunteers.append(bid.user)
+            volunteer_locations.append((bid.latitude, bid.longitude))
     
     if not volunteers:
         return None
@@ -470,17 +577,9 @@ async def prepare_routing_input_with_distances(
     dropoff_points = db.query(models.DropOffPoint).all()
     
     if not dropoff_points:
-        return schemas.RoutingInput(
-            distance_matrix=[],
-            drops_matrix=[],
-            item_volumes=[],
-            car_caps=[v.maxVolume for v in volunteers],
-            volunteer_ids=[v.id for v in volunteers],
-            dropoff_ids=[]
-        )
+        return _empty_routing_input(volunteers)
     
     # Parse drop-off locations
-    from app.services.maps_service import parse_location_string
     dropoff_locations = []
     valid_dropoffs = []
     for dp in dropoff_points:
@@ -490,73 +589,48 @@ async def prepare_routing_input_with_distances(
             valid_dropoffs.append(dp)
     
     if not dropoff_locations:
-        return schemas.RoutingInput(
-            distance_matrix=[],
-            drops_matrix=[],
-            item_volumes=[],
-            car_caps=[v.maxVolume for v in volunteers],
-            volunteer_ids=[v.id for v in volunteers],
-            dropoff_ids=[]
-        )
+        return _empty_routing_input(volunteers)
     
     # Get item volumes from pickup point
-    pickup_request = db.query(models.PickupRequest).filter(
-        models.PickupRequest.id == auction.pickupRequestID
-    ).first()
+    pickup_request = db.get(models.PickupRequest, auction.pickupRequestID)
     
-    item_volumes = []
-    if pickup_request:
-        items_at_pickup = db.query(models.ItemsAtPickupPoint).filter(
-            models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-        ).all()
-        
-        for item_record in items_at_pickup:
-            item = db.query(models.ItemVariant).filter(
-                models.ItemVariant.id == item_record.itemVariantID
-            ).first()
-            if item:
-                for _ in range(item_record.quantity):
-                    item_volumes.append(item.volume)
-    
-    # Calculate REAL distances using OpenRouteService
-    try:
+    item_volumes, item_id, num_item_types = _get_pickup_items(db, pickup_request)
+    
+    dropoff_ids = [dp.id for dp in valid_dropoffs]
+
+    # Distances between all dropoff points - only hit ORS when the dropoff set has changed
+    drops_matrix = get_cached_drops_matrix(db, dropoff_ids)
+
+    if len(volunteers) == 1 and len(valid_dropoffs) <= LOCAL_ESTIMATE_MAX_DROPOFFS:
+        # A lone volunteer with a couple of stops has nothing to optimise - skip the ORS round-trip
+        distance_matrix = estimate_distance_matrix(volunteer_locations, dropoff_locations)
+        if drops_matrix is None:
+            drops_matrix = estimate_distance_matrix(dropoff_locations, dropoff_locations)
+    else:
+        # Calculate REAL distances using OpenRouteService, running both lookups concurrently
         # Distance from EACH volunteer to each dropoff
-        distance_matrix = await calculate_distance_matrix(
+        lookups = [calculate_distance_matrix(
             origins=volunteer_locations,
             destinations=dropoff_locations
-        )
-    except Exception as e:
-        print(f"Error calculating volunteer->dropoff distances: {e}")
-        # Fallback: create matrix with default values for each volunteer
-        distance_matrix = [[10.0 for _ in dropoff_locations] for _ in volunteers]
-    
-    try:
-        # Distances between all dropoff points
-        drops_matrix = await calculate_distance_matrix(
-            origins=dropoff_locations,
-            destinations=dropoff_locations
-        )
-    except Exception as e:
-        print(f"Error calculating dropoff->dropoff distances: {e}")
-        num_dropoffs = len(dropoff_locations)
-        drops_matrix = [[10.0 for _ in range(num_dropoffs)] for _ in range(num_dropoffs)]
-    
-    dropoff_ids = [dp.id for dp in valid_dropoffs]
-    
-    # Get item_id from the pickup request items (use first item variant as the main item)
-    item_id = ""
-    if pickup_request:
-        first_item = db.query(models.ItemsAtPickupPoint).filter(
-            models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-        ).first()
-        if first_item:
-            item_id = first_item.itemVariantID
-    
+        )]
+        if drops_matrix is None:
+            lookups.append(refresh_dropoff_matrix(db, valid_dropoffs, symmetric=symmetric_matrix))
+        results = await asyncio.gather(*lookups, return_exceptions=True)
+
+        distance_matrix = results[0]
+        if isinstance(distance_matrix, Exception):
+            print(f"Error calculating volunteer->dropoff distances: {distance_matrix}")
+            # Fallback: estimate from straight-line distance for each volunteer
+            distance_matrix = estimate_distance_matrix(volunteer_locations, dropoff_locations)
+
+        if drops_matrix is None:
+            drops_matrix = results[1]
+            if isinstance(drops_matrix, Exception):
+                print(f"Error calculating dropoff->dropoff distances: {drops_matrix}")
+                drops_matrix = estimate_distance_matrix(dropoff_locations, dropoff_locations)
+
     # Car contents - initially empty for each volunteer
     # Each car has a vector of 0s representing no items currently loaded
-    num_item_types = len(set([iap.itemVariantID for iap in db.query(models.ItemsAtPickupPoint).filter(
-        models.ItemsAtPickupPoint.pickupPointID == pickup_request.pickupPointID
-    ).all()])) if pickup_request else 0
     car_contents = [[0.0 for _ in range(num_item_types)] for _ in volunteers]
     
     return schemas.RoutingInput(
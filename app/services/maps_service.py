@@ -5,32 +5,76 @@ Handles distance/time calculations using OpenRouteService API.
 https://openrouteservice.org/dev/#/api-docs
 """
 
+import asyncio
+import math
 import os
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
 import httpx
 from typing import List, Tuple, Optional
 
 # Configuration - set these via environment variables
 ORS_API_KEY = os.getenv("ORS_API_KEY", "")
 ORS_BASE_URL = os.getenv("ORS_BASE_URL", "https://api.openrouteservice.org")
+# Largest sources x destinations matrix ORS accepts in one request
+ORS_MATRIX_MAX_CELLS = int(os.getenv("ORS_MATRIX_MAX_CELLS", "3600"))
+# Seconds to wait for an ORS response
+ORS_TIMEOUT = float(os.getenv("ORS_TIMEOUT", "30"))
 
+# LRU of matrix results keyed on rounded coordinates, so repeated polls skip ORS
+MATRIX_CACHE_TTL = 24 * 60 * 60
+MATRIX_CACHE_SIZE = 256
+MATRIX_CACHE_PRECISION = 4  # ~10m
+_matrix_cache: "OrderedDict[tuple, tuple[List[List[float]], float]]" = OrderedDict()
 
-async def calculate_distance_matrix(
+# Straight-line estimates used when ORS is unavailable
+EARTH_RADIUS_KM = 6371.0
+FALLBACK_SPEED_KMH = 30.0  # Typical urban driving speed
+
+# Shared client so ORS calls reuse pooled keep-alive connections
+_ors_client: Optional[httpx.AsyncClient] = None
+
+
+def get_ors_client() -> httpx.AsyncClient:
+    """Get the shared OpenRouteService HTTP client, creating it if needed."""
+    global _ors_client
+    if _ors_client is None or _ors_client.is_closed:
+        _ors_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+            # Large matrices can take longer than httpx's 5s default to compute
+            timeout=httpx.Timeout(ORS_TIMEOUT, connect=5.0),
+        )
+    return _ors_client
+
+
+async def close_ors_client() -> None:
+    """Close the shared OpenRouteService HTTP client."""
+    global _ors_client
+    if _ors_client is not None:
+        await _ors_client.aclose()
+        _ors_client = None
+
+
+def _matrix_cache_key(
+    origins: List[Tuple[float, float]],
+    destinations: List[Tuple[float, float]]
+) -> tuple:
+    def rounded(coords):
+        return tuple(
+            (round(lat, MATRIX_CACHE_PRECISION), round(lng, MATRIX_CACHE_PRECISION))
+            for lat, lng in coords
+        )
+    return rounded(origins), rounded(destinations)
+
+
+async def _request_matrix(
     origins: List[Tuple[float, float]],
     destinations: List[Tuple[float, float]]
 ) -> List[List[float]]:
-    """
-    Calculate travel time matrix from origins to destinations using OpenRouteService.
-    
-    Args:
-        origins: List of (latitude, longitude) tuples
-        destinations: List of (latitude, longitude) tuples
-    
-    Returns:
-        Matrix of travel times in minutes [origins x destinations]
-    """
-    if not ORS_API_KEY:
-        raise ValueError("ORS_API_KEY environment variable not set")
-    
+    """Fetch a single travel time matrix (in minutes) from OpenRouteService."""
     # ORS expects coordinates as [longitude, latitude] (GeoJSON format)
     all_locations = []
     for lat, lng in origins:
@@ -56,13 +100,13 @@ async def calculate_distance_matrix(
         "units": "m"
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, headers=headers)
-        
-        if response.status_code != 200:
-            raise Exception(f"OpenRouteService API error: {response.status_code} - {response.text}")
-        
-        data = response.json()
+    client = get_ors_client()
+    response = await client.post(url, json=payload, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"OpenRouteService API error: {response.status_code} - {response.text}")
+    
+    data = response.json()
     
     # Extract durations (in seconds) and convert to minutes
     durations = data.get("durations", [])
@@ -74,6 +118,107 @@ async def calculate_distance_matrix(
     return matrix
 
 
+async def calculate_distance_matrix(
+    origins: List[Tuple[float, float]],
+    destinations: List[Tuple[float, float]]
+) -> List[List[float]]:
+    """
+    Calculate travel time matrix from origins to destinations using OpenRouteService.
+    
+    Args:
+        origins: List of (latitude, longitude) tuples
+        destinations: List of (latitude, longitude) tuples
+    
+    Returns:
+        Matrix of travel times in minutes [origins x destinations]
+    
+    Results are cached for MATRIX_CACHE_TTL seconds per set of coordinates.
+    """
+    if not ORS_API_KEY:
+        raise ValueError("ORS_API_KEY environment variable not set")
+    
+    cache_key = _matrix_cache_key(origins, destinations)
+    cached = _matrix_cache.get(cache_key)
+    if cached:
+        if cached[1] > time.monotonic():
+            _matrix_cache.move_to_end(cache_key)
+            return [row[:] for row in cached[0]]
+        del _matrix_cache[cache_key]
+    
+    # ORS caps the cells per request, so split large matrices into blocks and stitch them together
+    dest_chunk = max(1, min(len(destinations), ORS_MATRIX_MAX_CELLS))
+    origin_chunk = max(1, ORS_MATRIX_MAX_CELLS // dest_chunk)
+    origin_groups = [origins[i:i + origin_chunk] for i in range(0, len(origins), origin_chunk)]
+    dest_groups = [destinations[j:j + dest_chunk] for j in range(0, len(destinations), dest_chunk)]
+    
+    tasks = [
+        asyncio.ensure_future(_request_matrix(origin_group, dest_group))
+        for origin_group in origin_groups
+        for dest_group in dest_groups
+    ]
+    try:
+        blocks = await asyncio.gather(*tasks)
+    except BaseException:
+        # Don't leave the other block requests running once one has failed
+        for task in tasks:
+            task.cancel()
+        raise
+    
+    matrix = []
+    for g, origin_group in enumerate(origin_groups):
+        row_blocks = blocks[g * len(dest_groups):(g + 1) * len(dest_groups)]
+        for r in range(len(origin_group)):
+            matrix.append([t for block in row_blocks for t in block[r]])
+    
+    _matrix_cache[cache_key] = (matrix, time.monotonic() + MATRIX_CACHE_TTL)
+    if len(_matrix_cache) > MATRIX_CACHE_SIZE:
+        # Evict the least recently used entry
+        _matrix_cache.popitem(last=False)
+    
+    return [row[:] for row in matrix]
+
+
+def estimate_distance_matrix(
+    origins: List[Tuple[float, float]],
+    destinations: List[Tuple[float, float]]
+) -> List[List[float]]:
+    """
+    Estimate a travel time matrix from straight-line (haversine) distances.
+    
+    Used as a fallback when OpenRouteService is unavailable, assuming an
+    average speed of FALLBACK_SPEED_KMH.
+    
+    Args:
+        origins: List of (latitude, longitude) tuples
+        destinations: List of (latitude, longitude) tuples
+    
+    Returns:
+        Matrix of estimated travel times in minutes [origins x destinations]
+    """
+    def prepare(coords):
+        # Per-point radians and cos(latitude), reused for every pair
+        return [
+            (math.radians(lat), math.radians(lng), math.cos(math.radians(lat)))
+            for lat, lng in coords
+        ]
+    
+    minutes_per_km = 60.0 / FALLBACK_SPEED_KMH
+    dest_points = prepare(destinations)
+    matrix = []
+    for lat1, lng1, cos1 in prepare(origins):
+        row = []
+        for lat2, lng2, cos2 in dest_points:
+            a = (
+                math.sin((lat2 - lat1) / 2) ** 2
+                + cos1 * cos2 * math.sin((lng2 - lng1) / 2) ** 2
+            )
+            km = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+            row.append(km * minutes_per_km)
+        matrix.append(row)
+    
+    return matrix
+
+
 async def calculate_route(
     origin: Tuple[float, float],
     destination: Tuple[float, float],
@@ -115,13 +260,13 @@ async def calculate_route(
         "geometry": True
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, headers=headers)
-        
-        if response.status_code != 200:
-            raise Exception(f"OpenRouteService API error: {response.status_code} - {response.text}")
-        
-        data = response.json()
+    client = get_ors_client()
+    response = await client.post(url, json=payload, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"OpenRouteService API error: {response.status_code} - {response.text}")
+    
+    data = response.json()
     
     # Extract route summary
     routes = data.get("routes", [])
@@ -160,13 +305,13 @@ async def geocode(address: str) -> Optional[Tuple[float, float]]:
         "size": 1
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params, headers=headers)
-        
-        if response.status_code != 200:
-            return None
-        
-        data = response.json()
+    client = get_ors_client()
+    response = await client.get(url, params=params, headers=headers)
+    
+    if response.status_code != 200:
+        return None
+    
+    data = response.json()
     
     features = data.get("features", [])
     if not features:
@@ -204,13 +349,13 @@ async def reverse_geocode(lat: float, lng: float) -> Optional[str]:
         "size": 1
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params, headers=headers)
-        
-        if response.status_code != 200:
-            return None
-        
-        data = response.json()
+    client = get_ors_client()
+    response = await client.get(url, params=params, headers=headers)
+    
+    if response.status_code != 200:
+        return None
+    
+    data = response.json()
     
     features = data.get("features", [])
     if not features:
@@ -219,6 +364,11 @@ async def reverse_geocode(lat: float, lng: float) -> Optional[str]:
     return features[0].get("properties", {}).get("label")
 
 
+DECIMAL_LOCATION_RE = re.compile(r'^(-?\d+\.?\d*),\s*(-?\d+\.?\d*)$')
+DMS_LOCATION_RE = re.compile(r"(\d+)°(\d+)'([\d.]+)\"([NS])\s+(\d+)°(\d+)'([\d.]+)\"([EW])")
+
+
+@lru_cache(maxsize=4096)
 def parse_location_string(location: str) -> Optional[Tuple[float, float]]:
     """
     Parse a location string into (latitude, longitude).
@@ -226,17 +376,16 @@ def parse_location_string(location: str) -> Optional[Tuple[float, float]]:
     Supports formats:
     - "51.4994,-0.1745" (decimal)
     - "51°29'57.0\"N 0°10'39.3\"W" (DMS)
-    """
-    import re
     
+    Results are cached, since the same stored locations are parsed on every auction.
+    """
     # Try decimal format first
-    decimal_match = re.match(r'^(-?\d+\.?\d*),\s*(-?\d+\.?\d*)$', location)
+    decimal_match = DECIMAL_LOCATION_RE.match(location)
     if decimal_match:
         return float(decimal_match.group(1)), float(decimal_match.group(2))
     
     # Try DMS format
-    dms_pattern = r"(\d+)°(\d+)'([\d.]+)\"([NS])\s+(\d+)°(\d+)'([\d.]+)\"([EW])"
-    dms_match = re.match(dms_pattern, location)
+    dms_match = DMS_LOCATION_RE.match(location)
     if dms_match:
         lat_d, lat_m, lat_s, lat_dir = dms_match.groups()[:4]
         lng_d, lng_m, lng_s, lng_dir = dms_match.groups()[4:]
@@ -8,7 +8,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, models
 from app import schemas
 from app.auth import get_current_user as get_authenticated_user
 from app.services import auction_service
@@ -32,10 +32,7 @@ def create_auction(
         raise HTTPException(status_code=403, detail="Only managers can create auctions")
     
     # Check if pickup request exists
-    from app.database import models
-    pickup_request = db.query(models.PickupRequest).filter(
-        models.PickupRequest.id == auction_data.pickupRequestID
-    ).first()
+    pickup_request = db.get(models.PickupRequest, auction_data.pickupRequestID)
     
     if not pickup_request:
         raise HTTPException(status_code=404, detail="Pickup request not found")
@@ -204,7 +201,6 @@ def close_auction(
     if auction.status != "active":
         raise HTTPException(status_code=400, detail=f"Auction is already {auction.status}")
     
-    from app.database import models
     auction.status = "closed"
     db.commit()
     
@@ -12,6 +12,11 @@ def create_item(item_data: schemas.ItemVariantCreate, db: Session = Depends(get_
     new_item = crud.create_item_variant(db, item_data)
     return new_item
 
+@router.post("/bulk", response_model=list[schemas.ItemVariantRead])
+def create_items(items: list[schemas.ItemVariantCreate], db: Session = Depends(get_db)):
+    """Create several types of item in one request."""
+    return crud.create_item_variants(db, items)
+
 @router.get("/{id}", response_model=schemas.ItemVariantRead)
 def get_item(id: str, db: Session = Depends(get_db)):
     """Get details about an item."""
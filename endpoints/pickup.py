@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db, crud
@@ -18,41 +18,36 @@ def get_(id: str, db: Session = Depends(get_db)):
     pickup_point = crud.get_pickup_point(db, id)
     if not pickup_point:
         raise HTTPException(status_code=404, detail="Pickup Point not found")
-    return pickup_point
+    return Response(
+        content=schemas.PickupPointRead.model_validate(pickup_point).model_dump_json(),
+        media_type="application/json",
+    )
 
 
 @router.get("/{id}/items")
 def get_pickup_point_items(id: str, db: Session = Depends(get_db)):
     """Get the items currently held by a pickup point."""
-    pickup_point = crud.get_pickup_point(db, id)
-    if not pickup_point:
+    rows = crud.get_pickup_point_with_items(db, id)
+    if not rows:
         raise HTTPException(status_code=404, detail="Pickup Point not found")
     
-    items = crud.get_all_items_at_pickup_point(db, id)
-    return [{"id": item.itemVariantID, "quantity": item.quantity} for item in items]
+    return [
+        {"id": item_id, "quantity": quantity} for item_id, quantity in rows if item_id is not None
+    ]
 
 
 @router.patch("/{pickupID}/items/{itemID}")
 def set_pickup_item_quantity(
     pickupID: str,
     itemID: str,
-    data: dict,
+    data: schemas.ItemQuantityUpdate,
     db: Session = Depends(get_db)
 ):
     """Set the quantity of an item at a pickup point."""
-    pickup_point = crud.get_pickup_point(db, pickupID)
-    if not pickup_point:
+    if not crud.pickup_point_exists(db, pickupID):
         raise HTTPException(status_code=404, detail="Pickup Point not found")
     
-    quantity = data.get("quantity", 0)
-    result = crud.update_items_at_pickup_point(db, pickupID, itemID, quantity)
-    if not result:
-        # Create new record if it doesn't exist
-        crud.create_items_at_pickup_point(db, schemas.ItemsAtPickupPointCreate(
-            pickupPointID=pickupID,
-            itemVariantID=itemID,
-            quantity=quantity
-        ))
+    crud.upsert_items_at_pickup_point(db, pickupID, itemID, data.quantity)
     
     return {"code": 200, "message": "Action carried out successfully."}
 
@@ -1,5 +1,3 @@
-from typing import List
-
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -10,14 +8,14 @@ from app.auth import get_current_user as get_authenticated_user
 router = APIRouter(prefix="/pickuprequests", tags=["pickup"])
 
 
-@router.get("/", response_model=List[schemas.PickupRequest])
+@router.get("/")
 def get_pickup_requests(
     db: Session = Depends(get_db),
     current_user=Depends(get_authenticated_user),
 ):
     """Get active pickup requests."""
     requests = crud.get_active_pickup_requests(db)
-    return [schemas.PickupRequest(id=r.id, pickupPointID=r.pickupPointID) for r in requests]
+    return [{"id": r.id, "pickupPointID": r.pickupPointID} for r in requests]
 
 
 @router.post("/")
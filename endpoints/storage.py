@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db, crud, models
+from app.database import get_db, crud
 from app import schemas
 
 router = APIRouter(prefix="/storage", tags=["storage"])
@@ -22,7 +22,10 @@ def get_storage_point(id: str, db: Session = Depends(get_db)):
     storage_point = crud.get_storage_point(db, id)
     if not storage_point:
         raise HTTPException(status_code=404, detail="Storage point not found")
-    return storage_point
+    return Response(
+        content=schemas.StoragePointRead.model_validate(storage_point).model_dump_json(),
+        media_type="application/json",
+    )
 
 
 @router.patch("/{id}", response_model=schemas.StoragePointRead)
@@ -41,22 +44,18 @@ def update_storage_point(
 @router.get("/{id}/items", response_model=list[schemas.StorageItemResponse])
 def get_storage_items(id: str, db: Session = Depends(get_db)):
     """Get the items currently held by a storage point."""
-    # Verify storage point exists
-    storage_point = crud.get_storage_point(db, id)
-    if not storage_point:
+    # Storage point and its items in one query - no rows means it doesn't exist
+    rows = crud.get_storage_point_with_items(db, id)
+    if not rows:
         raise HTTPException(status_code=404, detail="Storage point not found")
 
-    # Get all items in this storage point
-    items = db.query(models.ItemsInStorage).filter(
-        models.ItemsInStorage.storageID == id
-    ).all()
-
     return [
         {
-            "id": item.itemVariantID,
-            "quantity": item.quantity
+            "id": item_id,
+            "quantity": quantity
         }
-        for item in items
+        for item_id, quantity in rows
+        if item_id is not None
     ]
 
 
@@ -64,22 +63,13 @@ def get_storage_items(id: str, db: Session = Depends(get_db)):
 def set_storage_item_quantity(
     storageID: str,
     itemID: str,
-    data: dict,
+    data: schemas.ItemQuantityUpdate,
     db: Session = Depends(get_db)
 ):
     """Set the quantity of an item at a storage point."""
-    storage_point = crud.get_storage_point(db, storageID)
-    if not storage_point:
+    if not crud.storage_point_exists(db, storageID):
         raise HTTPException(status_code=404, detail="Storage point not found")
     
-    quantity = data.get("quantity", 0)
-    result = crud.update_items_in_storage(db, storageID, itemID, quantity)
-    if not result:
-        # Create new record if it doesn't exist
-        crud.create_items_in_storage(db, schemas.ItemsInStorageCreate(
-            storageID=storageID,
-            itemVariantID=itemID,
-            quantity=quantity
-        ))
+    crud.upsert_items_in_storage(db, storageID, itemID, data.quantity)
     
     return {"code": 200, "message": "Action carried out successfully."}
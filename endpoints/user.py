@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db, crud
@@ -38,7 +38,7 @@ def update_current_user(
 
 @router.post("/me/location")
 def update_user_location(
-    location: dict,
+    location: schemas.LocationUpdate,
     current_user = Depends(get_authenticated_user),
     db: Session = Depends(get_db)
 ):
@@ -58,7 +58,10 @@ def get_user(id: str, db: Session = Depends(get_db)):
     user = crud.get_user(db, id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return Response(
+        content=schemas.UserRead.model_validate(user).model_dump_json(),
+        media_type="application/json",
+    )
 
 
 @router.patch("/{id}", response_model=schemas.UserRead)
@@ -73,34 +76,26 @@ def update_user(id: str, user_data: schemas.UserCreate, db: Session = Depends(ge
 @router.get("/{id}/items")
 def get_user_items(id: str, db: Session = Depends(get_db)):
     """Get the items currently held by a user."""
-    user = crud.get_user(db, id)
-    if not user:
+    rows = crud.get_user_with_items(db, id)
+    if not rows:
         raise HTTPException(status_code=404, detail="User not found")
     
-    items = crud.get_all_items_in_car(db, id)
-    return [{"id": item.itemVariantID, "quantity": item.quantity} for item in items]
+    return [
+        {"id": item_id, "quantity": quantity} for item_id, quantity in rows if item_id is not None
+    ]
 
 
 @router.patch("/{userID}/items/{itemID}")
 def set_user_item_quantity(
     userID: str,
     itemID: str,
-    data: dict,
+    data: schemas.ItemQuantityUpdate,
     db: Session = Depends(get_db)
 ):
     """Set the quantity of an item in a user's car."""
-    user = crud.get_user(db, userID)
-    if not user:
+    if not crud.user_exists(db, userID):
         raise HTTPException(status_code=404, detail="User not found")
     
-    quantity = data.get("quantity", 0)
-    result = crud.update_items_in_car(db, userID, itemID, quantity)
-    if not result:
-        # Create new record if it doesn't exist
-        crud.create_items_in_car(db, schemas.ItemsInCarCreate(
-            userID=userID,
-            itemVariantID=itemID,
-            quantity=quantity
-        ))
+    crud.upsert_items_in_car(db, userID, itemID, data.quantity)
     
     return {"code": 200, "message": "Action carried out successfully."}
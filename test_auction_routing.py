@@ -4,10 +4,12 @@ Run with: python test_auction_routing.py
 """
 
 import asyncio
+import os
 import uuid
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -18,10 +20,15 @@ from app.services.auction_service import prepare_routing_input_with_distances, c
 from app import schemas
 
 
-# Setup test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_routing.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Setup test database - in memory unless TEST_DATABASE_URL points at a file for debugging
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite://")
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
 
 
 def setup_test_data(db):
@@ -51,8 +58,6 @@ def setup_test_data(db):
             userType=0
         )
     ]
-    for v in volunteers:
-        db.add(v)
     
     # Create dropoff points in London area
     dropoff_locations = [
@@ -71,7 +76,6 @@ def setup_test_data(db):
             location=loc
         )
         dropoffs.append(dp)
-        db.add(dp)
     
     # Create pickup point
     pickup = PickupPoint(
@@ -79,7 +83,6 @@ def setup_test_data(db):
         name="Charity Warehouse",
         location="51.5200,-0.1000"  # East London
     )
-    db.add(pickup)
     
     # Create 5 item variants (types)
     items = [
@@ -89,8 +92,6 @@ def setup_test_data(db):
         ItemVariant(id="item-type-4", name="Bedding", volume=15.0),
         ItemVariant(id="item-type-5", name="Kitchen Items", volume=10.0),
     ]
-    for item in items:
-        db.add(item)
     
     # Add items to pickup point (some quantity of each type)
     items_at_pickup = [
@@ -100,16 +101,14 @@ def setup_test_data(db):
         ItemsAtPickupPoint(pickupPointID="pickup-1", itemVariantID="item-type-4", quantity=1),
         ItemsAtPickupPoint(pickupPointID="pickup-1", itemVariantID="item-type-5", quantity=2),
     ]
-    for iap in items_at_pickup:
-        db.add(iap)
     
     # Create pickup request
     pickup_request = PickupRequest(
         id="request-1",
         pickupPointID="pickup-1"
     )
-    db.add(pickup_request)
     
+    db.add_all(volunteers + dropoffs + [pickup] + items + items_at_pickup + [pickup_request])
     db.commit()
     
     return {
@@ -125,31 +124,34 @@ def create_auction_with_bids(db, pickup_request_id: str, volunteer_bids: list):
     
     volunteer_bids: list of tuples (volunteer_id, latitude, longitude)
     """
+    now = datetime.utcnow()
+    
     # Create auction
     auction = Auction(
         id=f"auction-{uuid.uuid4().hex[:8]}",
         pickupRequestID=pickup_request_id,
         status="active",
-        createdAt=datetime.utcnow(),
-        expiresAt=datetime.utcnow() + timedelta(seconds=60)
+        createdAt=now,
+        expiresAt=now + timedelta(seconds=60)
     )
-    db.add(auction)
-    db.commit()
     
-    # Submit bids from each volunteer
-    for vol_id, lat, lon in volunteer_bids:
-        bid = AuctionBid(
-            auctionID=auction.id,
-            userID=vol_id,
-            accepted=True,
-            latitude=lat,
-            longitude=lon,
-            estimatedTime=10.0,
-            score=0.5,
-            createdAt=datetime.utcnow()
-        )
-        db.add(bid)
+    db.add(auction)
+    db.flush()
     
+    # Submit bids from each volunteer in one multi-row INSERT
+    db.execute(AuctionBid.__table__.insert(), [
+        {
+            "auctionID": auction.id,
+            "userID": vol_id,
+            "accepted": True,
+            "latitude": lat,
+            "longitude": lon,
+            "estimatedTime": 10.0,
+            "score": 0.5,
+            "createdAt": now,
+        }
+        for vol_id, lat, lon in volunteer_bids
+    ])
     db.commit()
     return auction
 
@@ -157,9 +159,10 @@ def create_auction_with_bids(db, pickup_request_id: str, volunteer_bids: list):
 async def test_routing_input_with_multiple_volunteers():
     """Test that routing input includes ALL available volunteers."""
     
-    # Reset database
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    # Reset database - clear rows children-first rather than rebuilding the schema
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
     
     db = TestingSessionLocal()
     
@@ -259,9 +262,7 @@ async def test_routing_input_with_multiple_volunteers():
             errors.append("item_id is empty, expected an item variant ID")
         
         if errors:
-            print("\n❌ VALIDATION FAILED:")
-            for err in errors:
-                print(f"   - {err}")
+            print("\n❌ VALIDATION FAILED:\n" + "\n".join(f"   - {err}" for err in errors))
             return False
         else:
             print("\n✅ ALL VALIDATIONS PASSED!")
@@ -3,20 +3,65 @@ Automated test script for all API endpoints.
 Run with: pytest test_endpoints.py -v
 """
 
+import asyncio
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import pytest
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, DropOffDistance
+from app.database.models import (
+    User, ApiKey, PickupPoint, PickupRequest, Auction, AuctionBid, StoragePoint, DropOffPoint
+)
+from app.auth import hash_api_key, invalidate_api_key
 from app import schemas
+from app.services import auction_service, maps_service
+from app.services.maps_service import estimate_distance_matrix
+
+# Setup test database - in memory unless TEST_DATABASE_URL points at a file for debugging.
+# StaticPool keeps the single connection an in-memory database lives on.
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite://")
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+# pysqlite's own transaction handling breaks SAVEPOINTs, so let SQLAlchemy emit BEGIN itself
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+# Test data is throwaway, so skip fsyncs and on-disk journals when TEST_DATABASE_URL is a file
+@event.listens_for(engine, "connect")
+def _fast_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
 
-# Setup test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create test database tables
+@event.listens_for(engine, "begin")
+def _begin_transaction(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# Sessions commit to a SAVEPOINT when bound to a test's outer transaction
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, join_transaction_mode="create_savepoint"
+)
+
+# Create test database tables once; each test's changes are rolled back
+Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
 
 
@@ -31,19 +76,56 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# One client shared by every test
 client = TestClient(app)
 
 
+def insert_rows(*rows):
+    """Insert rows straight into the test database, bypassing the API."""
+    db = TestingSessionLocal()
+    db.add_all(rows)
+    db.commit()
+    db.close()
+
+
+@contextmanager
+def rolled_back_transaction():
+    """Bind test sessions to one outer transaction and roll it back on exit."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    try:
+        yield
+    finally:
+        TestingSessionLocal.configure(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
 # ============================================================================
 # FIXTURES
 # ============================================================================
 
+@pytest.fixture(scope="session", autouse=True)
+def warm_client():
+    """Send one request per create endpoint so first-request costs aren't paid inside a test."""
+    with rolled_back_transaction():
+        assert client.get("/test").status_code == 200
+        for path, payload in [
+            ("/storage/", {"id": "warm", "name": "Warm", "maxVolume": 1, "location": "0,0"}),
+            ("/item/", {"id": "warm", "name": "Warm", "volume": 1}),
+            ("/dropoff/", {"id": "warm", "name": "Warm", "location": "0,0"}),
+            ("/pickup/", {"id": "warm", "name": "Warm", "location": "0,0"}),
+        ]:
+            assert client.post(path, json=payload).status_code == 200
+
+
 @pytest.fixture(autouse=True)
 def reset_database():
-    """Reset database before each test."""
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    yield
+    """Run each test inside a transaction that is rolled back afterwards."""
+    with rolled_back_transaction():
+        invalidate_api_key()
+        yield
 
 
 @pytest.fixture
@@ -56,9 +138,7 @@ def sample_user():
         "maxVolume": 50.0,
         "userType": 1
     }
-    response = client.post("/user/", json=user_data)
-    # If no POST endpoint exists, we'll need to create directly in DB
-    # For now, return the data
+    insert_rows(User(**user_data))
     return user_data
 
 
@@ -71,7 +151,7 @@ def sample_storage():
         "maxVolume": 100.0,
         "location": "Test Location"
     }
-    response = client.post("/storage/", json=storage_data)
+    insert_rows(StoragePoint(**storage_data))
     return storage_data
 
 
@@ -83,10 +163,28 @@ def sample_dropoff():
         "name": "Test Dropoff",
         "location": "Test Dropoff Location"
     }
-    response = client.post("/dropoff/", json=dropoff_data)
+    insert_rows(DropOffPoint(**dropoff_data))
     return dropoff_data
 
 
+@pytest.fixture
+def completed_auction():
+    """Create a completed auction with one accepted volunteer bid and a manager key."""
+    now = datetime.utcnow()
+    insert_rows(
+        User(id="manager-001", name="Manager", karma=0, maxVolume=0, userType=1),
+        User(id="volunteer-001", name="Volunteer", karma=50, maxVolume=40, userType=0),
+        ApiKey(userID="manager-001", keyHash=hash_api_key("manager-key")),
+        PickupPoint(id="pickup-001", name="Pickup", location="51.5200,-0.1000"),
+        PickupRequest(id="request-001", pickupPointID="pickup-001"),
+        Auction(id="auction-001", pickupRequestID="request-001", status="completed",
+                createdAt=now, expiresAt=now + timedelta(seconds=60)),
+        AuctionBid(auctionID="auction-001", userID="volunteer-001", accepted=1,
+                   latitude=51.51, longitude=-0.13, createdAt=now),
+    )
+    return "auction-001"
+
+
 # ============================================================================
 # DEFAULT ENDPOINTS
 # ============================================================================
@@ -201,6 +299,19 @@ class TestStorageEndpoints:
         data = response.json()
         assert isinstance(data, list)
 
+    def test_set_and_get_storage_items(self, sample_storage):
+        """Test setting an item quantity then listing the storage point's items."""
+        storage_id = sample_storage["id"]
+        response = client.patch(f"/storage/{storage_id}/items/item-001", json={"quantity": 3})
+        assert response.status_code == 200
+
+        response = client.patch(f"/storage/{storage_id}/items/item-001", json={"quantity": 7})
+        assert response.status_code == 200
+
+        response = client.get(f"/storage/{storage_id}/items")
+        assert response.status_code == 200
+        assert response.json() == [{"id": "item-001", "quantity": 7}]
+
     def test_get_storage_items_not_found(self):
         """Test getting items from non-existent storage point returns 404."""
         response = client.get("/storage/nonexistent-storage/items")
@@ -267,6 +378,185 @@ class TestDropoffEndpoints:
         response = client.patch("/dropoff/nonexistent-dropoff", json=updated_data)
         assert response.status_code == 404
 
+    def test_update_dropoff_location_clears_cached_distances(self, sample_dropoff):
+        """Test moving a dropoff point drops its cached travel times."""
+        dropoff_id = sample_dropoff["id"]
+        db = TestingSessionLocal()
+        db.add(DropOffDistance(fromID=dropoff_id, toID=dropoff_id, minutes=0.0))
+        db.commit()
+
+        updated_data = dict(sample_dropoff, location="51.5074,-0.1278")
+        response = client.patch(f"/dropoff/{dropoff_id}", json=updated_data)
+        assert response.status_code == 200
+
+        assert db.query(DropOffDistance).count() == 0
+        db.close()
+
+    def test_dropoff_matrix_refresh_only_fetches_new_points(self, monkeypatch):
+        """Test adding a dropoff only requests travel times for the new point."""
+        requests = []
+
+        async def fake_matrix(origins, destinations):
+            requests.append((len(origins), len(destinations)))
+            return [[abs(o[0] - d[0]) * 100 for d in destinations] for o in origins]
+
+        monkeypatch.setattr(auction_service, "calculate_distance_matrix", fake_matrix)
+        insert_rows(*[
+            DropOffPoint(id=f"dropoff-{i}", name="Dropoff", location=f"51.{i},0")
+            for i in range(3)
+        ])
+        db = TestingSessionLocal()
+        asyncio.run(auction_service.refresh_dropoff_matrix(db))
+
+        insert_rows(DropOffPoint(id="dropoff-3", name="Dropoff", location="51.3,0"))
+        matrix = asyncio.run(auction_service.refresh_dropoff_matrix(db))
+        db.close()
+
+        assert requests == [(3, 3), (1, 4)]
+        assert [[round(t) for t in row] for row in matrix] == [
+            [abs(i - j) * 10 for j in range(4)] for i in range(4)
+        ]
+
+
+# ============================================================================
+# ITEM ENDPOINTS
+# ============================================================================
+
+class TestItemEndpoints:
+    """Tests for item variant endpoints."""
+
+    def test_create_items_in_bulk(self):
+        """Test creating several items in one request."""
+        items = [{"id": f"item-{i:03d}", "name": f"Item {i}", "volume": i + 1} for i in range(5)]
+        response = client.post("/item/bulk", json=items)
+        assert response.status_code == 200
+        assert response.json() == items
+
+        response = client.get("/item/item-004")
+        assert response.status_code == 200
+        assert response.json()["volume"] == 5
+
+
+# ============================================================================
+# MAPS SERVICE
+# ============================================================================
+
+class TestMapsService:
+    """Tests for OpenRouteService matrix requests."""
+
+    @pytest.fixture(autouse=True)
+    def small_ors_limit(self, monkeypatch):
+        """Pretend ORS is configured and only accepts 4-cell matrices."""
+        monkeypatch.setattr(maps_service, "ORS_API_KEY", "test-key")
+        monkeypatch.setattr(maps_service, "ORS_MATRIX_MAX_CELLS", 4)
+        monkeypatch.setattr(maps_service, "_matrix_cache", OrderedDict())
+
+    def test_large_matrix_is_split_and_stitched(self, monkeypatch):
+        """Test a matrix over the cell limit is fetched in blocks and reassembled in order."""
+        requests = []
+
+        async def fake_request(origins, destinations):
+            requests.append((len(origins), len(destinations)))
+            return [[o[0] * 10 + d[0] for d in destinations] for o in origins]
+        monkeypatch.setattr(maps_service, "_request_matrix", fake_request)
+
+        origins = [(i, 0.0) for i in range(3)]
+        destinations = [(j, 0.0) for j in range(5)]
+        matrix = asyncio.run(maps_service.calculate_distance_matrix(origins, destinations))
+
+        assert sorted(requests) == [(1, 1)] * 3 + [(1, 4)] * 3
+        assert matrix == [[i * 10 + j for j in range(5)] for i in range(3)]
+
+    def test_failed_block_cancels_remaining_requests(self, monkeypatch):
+        """Test one failing block request cancels the others instead of leaving them running."""
+        cancelled = []
+
+        async def fake_request(origins, destinations):
+            if origins[0][0] == 0:
+                raise RuntimeError("ORS down")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(origins[0][0])
+                raise
+        monkeypatch.setattr(maps_service, "_request_matrix", fake_request)
+
+        origins = [(i, 0.0) for i in range(3)]
+        destinations = [(j, 0.0) for j in range(4)]
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await maps_service.calculate_distance_matrix(origins, destinations)
+            await asyncio.sleep(0)
+            assert sorted(cancelled) == [1, 2]
+
+        asyncio.run(run())
+
+
+# ============================================================================
+# AUCTION ENDPOINTS
+# ============================================================================
+
+class TestAuctionEndpoints:
+    """Tests for auction endpoints."""
+
+    def test_routing_input_without_dropoffs(self, completed_auction):
+        """Test routing input short-circuits to empty matrices when there are no dropoffs."""
+        response = client.get(f"/auction/{completed_auction}/routing-input",
+                              headers={"X-API-Key": "manager-key"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["volunteer_ids"] == ["volunteer-001"]
+        assert data["car_caps"] == [40]
+        assert data["dropoff_ids"] == []
+        assert data["drops_matrix"] == []
+
+    def test_routing_input_single_volunteer_skips_ors(self, completed_auction, monkeypatch):
+        """Test one volunteer with a single dropoff is routed on local estimates."""
+        async def fail_matrix(*args, **kwargs):
+            raise AssertionError("ORS should not be called")
+        monkeypatch.setattr(auction_service, "calculate_distance_matrix", fail_matrix)
+
+        insert_rows(DropOffPoint(id="dropoff-001", name="Dropoff", location="51.5000,-0.1200"))
+
+        response = client.get(f"/auction/{completed_auction}/routing-input",
+                              headers={"X-API-Key": "manager-key"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dropoff_ids"] == ["dropoff-001"]
+        assert data["distance_matrix"] == estimate_distance_matrix([(51.51, -0.13)], [(51.5, -0.12)])
+        assert data["drops_matrix"] == [[0]]
+
+    def test_resubmitted_bid_replaces_earlier_bid(self):
+        """Test a volunteer bidding twice updates their bid rather than adding another."""
+        now = datetime.utcnow()
+        insert_rows(
+            User(id="volunteer-001", name="Volunteer", karma=50, maxVolume=40, userType=0),
+            ApiKey(userID="volunteer-001", keyHash=hash_api_key("volunteer-key")),
+            PickupPoint(id="pickup-001", name="Pickup", location="51.5200,-0.1000"),
+            PickupRequest(id="request-001", pickupPointID="pickup-001"),
+            Auction(id="auction-001", pickupRequestID="request-001", status="active",
+                    createdAt=now, expiresAt=now + timedelta(seconds=60)),
+        )
+        headers = {"X-API-Key": "volunteer-key"}
+
+        response = client.post("/auction/auction-001/bid", headers=headers,
+                               json={"accepted": True, "latitude": 51.51, "longitude": -0.13})
+        assert response.status_code == 200
+        assert response.json()["latitude"] == 51.51
+
+        response = client.post("/auction/auction-001/bid", headers=headers,
+                               json={"accepted": False})
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 0
+
+        db = TestingSessionLocal()
+        bids = db.query(AuctionBid).all()
+        db.close()
+        assert len(bids) == 1
+        assert bids[0].accepted == 0
+        assert bids[0].latitude is None
+
 
 # ============================================================================
 # INTEGRATION TESTS